@@ -0,0 +1,53 @@
+"""
+Pixel reduction kernels for the rasterio fallback.
+Uses numba when it's installed, plain numpy otherwise.
+"""
+
+import sys
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# numba's on-disk cache is keyed on the .py source, which a frozen bundle
+# doesn't ship; there the kernel is compiled once per process instead.
+_CACHE = not getattr(sys, "frozen", False)
+
+
+if HAS_NUMBA:
+    # nogil rather than parallel: the kernel is called from the query
+    # thread pool, and numba's default threading layer isn't thread-safe.
+    @njit(nogil=True, cache=_CACHE)
+    def _reduce_masked(arr, mask):
+        n = 0
+        s = 0.0
+        ss = 0.0
+        mn = np.inf
+        mx = -np.inf
+        for i in range(arr.shape[0]):
+            for j in range(arr.shape[1]):
+                if mask[i, j]:
+                    v = np.float64(arr[i, j])
+                    n += 1
+                    s += v
+                    ss += v * v
+                    mn = min(mn, v)
+                    mx = max(mx, v)
+        return n, s, ss, mn, mx
+
+
+def reduce_masked(arr: np.ndarray, mask: np.ndarray) -> tuple:
+    """
+    (count, sum, sum of squares, min, max) over the pixels of a 2-D `arr`
+    where `mask` is set, in one fused pass when numba is available.
+    """
+    if HAS_NUMBA:
+        return _reduce_masked(arr, mask)
+    v = arr[mask].astype(np.float64, copy=False)
+    if v.size == 0:
+        return 0, 0.0, 0.0, np.inf, -np.inf
+    return v.size, float(v.sum()), float(np.dot(v, v)), float(v.min()), float(v.max())
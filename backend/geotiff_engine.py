@@ -3,17 +3,28 @@ Core GeoTIFF processing engine.
 Handles raster loading, zonal statistics, and geometry building.
 """
 
+import math
 import os
+import secrets
 import tempfile
-import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
 import rasterio
+from affine import Affine
+from rasterio.enums import MaskFlags, Resampling
+from rasterio.windows import Window, from_bounds
 from pyproj import Transformer, Geod
+import shapely
 from shapely.geometry import Point, Polygon, box, mapping
 
+from ._kernels import reduce_masked
+
 try:
     from exactextract import exact_extract
     HAS_EXACT = True
@@ -23,6 +34,47 @@ except ImportError:
 WGS84 = "EPSG:4326"
 CIRCLE_PTS = 360
 
+# WGS84 ellipsoid, for the small-circle radii of curvature
+WGS84_A = 6378137.0
+WGS84_E2 = 6.69437999014e-3
+# Below this radius, circles are built from the osculating sphere instead
+# of Geod.fwd (radial error < 0.02% at any latitude)
+SMALL_CIRCLE_MAX_M = 200_000
+
+# Geometries covering more pixels than this use a pixel-centre test
+# instead of exactextract's fractional edge coverage
+EDGE_FRAC_THRESHOLD = 1e6
+# Geometries covering more native pixels than this are served from the
+# decimated overview kept in memory, when the raster has one
+OVERVIEW_MIN_PIXELS = 16_000_000
+# Averaging preserves these; stdev, min, max and median need native pixels
+OVERVIEW_STATS = frozenset({"sum", "mean", "count"})
+# Rasters are decimated so the overview holds at most about this many
+# pixels squared, whatever the aspect ratio
+OVERVIEW_TARGET = 2048
+# Fallback stats read block-aligned tiles of roughly this many pixels a side
+TILE_TARGET = 512
+
+# Vertex azimuths shared by every circle (radians, clockwise from north)
+_AZ = np.linspace(0, 2 * np.pi, CIRCLE_PTS, endpoint=False)
+_SIN_AZ = np.sin(_AZ)
+_COS_AZ = np.cos(_AZ)
+
+_GEOD = Geod(ellps="WGS84")
+
+# Shared pool for independent per-geometry work; GDAL drops the GIL on reads
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+_POOL = ThreadPoolExecutor(max_workers=MAX_WORKERS,
+                           thread_name_prefix="geo_stats")
+# Below this many geometries a query isn't worth splitting across threads
+PARALLEL_MIN_GEOMS = 4
+
+
+@lru_cache(maxsize=32)
+def _transformer(src: str, dst: str) -> Transformer:
+    """Cached CRS transformer; building one hits the PROJ database."""
+    return Transformer.from_crs(src, dst, always_xy=True)
+
 # ── Dataclasses ──────────────────────────────────────────────────────────────
 
 @dataclass
@@ -37,6 +89,12 @@ class RasterInfo:
     nodata: float | None
     bounds: dict  # {west, south, east, north} in WGS84
     bounds_polygon: list  # [[lon, lat], ...] ring in WGS84
+    to_wgs: Transformer | None = field(default=None, repr=False)  # native → WGS84
+    # band 1 decimated by overview_factor (average), read once at load;
+    # only kept when every native pixel is valid
+    overview: np.ndarray | None = field(default=None, repr=False)
+    overview_transform: Affine | None = field(default=None, repr=False)
+    overview_factor: int = 1
 
 
 @dataclass
@@ -48,30 +106,55 @@ class QueryResult:
 
 # ── Raster Store ─────────────────────────────────────────────────────────────
 
+class EmptyUploadError(Exception):
+    """The uploaded file had no bytes."""
+
+
 class RasterStore:
     """
-    Manages loaded rasters. Stores temp files and metadata.
-    Thread-safe enough for single-user Electron use.
+    Manages loaded rasters. Stores temp files, metadata and open
+    dataset handles. Thread-safe enough for single-user Electron use.
     """
 
     def __init__(self):
         self._rasters: dict[str, RasterInfo] = {}
+        self._datasets: dict[str, rasterio.DatasetReader] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
         self._tmp_dir = tempfile.mkdtemp(prefix="geo_analyzer_")
 
-    def load(self, filename: str, data: bytes) -> tuple[str, RasterInfo]:
-        """Save uploaded bytes, read metadata, return (raster_id, info)."""
-        raster_id = uuid.uuid4().hex[:12]
-        ext = Path(filename).suffix or ".tif"
+    def load(self, file_storage) -> tuple[str, RasterInfo]:
+        """
+        Stream an uploaded file (Werkzeug FileStorage) to disk, read its
+        metadata and return (raster_id, info).
+        """
+        raster_id = secrets.token_hex(6)
+        while raster_id in self._rasters:
+            raster_id = secrets.token_hex(6)
+        ext = Path(file_storage.filename or "").suffix or ".tif"
         path = os.path.join(self._tmp_dir, f"{raster_id}{ext}")
 
-        with open(path, "wb") as f:
-            f.write(data)
+        file_storage.save(path, buffer_size=1 << 20)
+        try:
+            if os.path.getsize(path) == 0:
+                raise EmptyUploadError("Empty file")
+            info = self._read_info(path)
+        except Exception:
+            os.unlink(path)
+            raise
+
+        with self._lock:
+            self._locks[raster_id] = threading.Lock()
+        self._rasters[raster_id] = info
+        return raster_id, info
 
+    def _read_info(self, path: str) -> RasterInfo:
         with rasterio.open(path) as ds:
             # get bounds in WGS84
             b = ds.bounds
+            to_wgs = None
             if ds.crs and not ds.crs.is_geographic:
-                to_wgs = Transformer.from_crs(ds.crs, WGS84, always_xy=True)
+                to_wgs = _transformer(ds.crs.to_wkt(), WGS84)
                 corners = [
                     to_wgs.transform(b.left, b.bottom),
                     to_wgs.transform(b.right, b.bottom),
@@ -106,16 +189,71 @@ class RasterStore:
                 nodata=ds.nodata,
                 bounds=bounds_wgs,
                 bounds_polygon=ring,
+                to_wgs=to_wgs,
             )
 
-        self._rasters[raster_id] = info
-        return raster_id, info
+            # Average resampling drops masked pixels from each average and
+            # lets NaN through, so an overview pixel only stands for a known
+            # number of native pixels when band 1 has no nodata at all.
+            if (ds.width * ds.height > OVERVIEW_MIN_PIXELS
+                    and ds.mask_flag_enums[0] == [MaskFlags.all_valid]):
+                factor = math.ceil(
+                    math.sqrt(ds.width * ds.height) / OVERVIEW_TARGET
+                )
+                ov_h = max(1, ds.height // factor)
+                ov_w = max(1, ds.width // factor)
+                overview = ds.read(
+                    1, out_shape=(ov_h, ov_w), out_dtype="float32",
+                    resampling=Resampling.average,
+                )
+                if not np.isnan(overview).any():
+                    info.overview = overview
+                    info.overview_transform = ds.transform * Affine.scale(
+                        ds.width / ov_w, ds.height / ov_h
+                    )
+                    info.overview_factor = factor
+        return info
 
     def get(self, raster_id: str) -> RasterInfo | None:
         return self._rasters.get(raster_id)
 
+    def _raster_lock(self, raster_id: str) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(raster_id)
+        if lock is None:
+            raise KeyError(raster_id)
+        return lock
+
+    @contextmanager
+    def dataset(self, raster_id: str):
+        """
+        Yield the open dataset for a raster, opening it on first use so
+        headers and the block index are parsed once, not per query.
+        GDAL handles aren't safe to share between threads, so that
+        raster's lock is held for the duration of the block; queries on
+        other rasters aren't held up.
+        """
+        with self._raster_lock(raster_id):
+            info = self._rasters.get(raster_id)
+            if info is None:
+                raise KeyError(raster_id)
+            ds = self._datasets.get(raster_id)
+            if ds is None:
+                ds = rasterio.open(info.path)
+                self._datasets[raster_id] = ds
+            yield ds
+
     def remove(self, raster_id: str):
-        info = self._rasters.pop(raster_id, None)
+        with self._lock:
+            lock = self._locks.pop(raster_id, None)
+        if lock is None:
+            return
+        # wait for any query still reading this raster, not the others
+        with lock:
+            ds = self._datasets.pop(raster_id, None)
+            if ds is not None:
+                ds.close()
+            info = self._rasters.pop(raster_id, None)
         if info and os.path.exists(info.path):
             try:
                 os.unlink(info.path)
@@ -133,128 +271,492 @@ class RasterStore:
 
 # ── Geometry Builders ────────────────────────────────────────────────────────
 
+def _radii_of_curvature(lat: float) -> tuple[float, float]:
+    """Meridional (M) and prime-vertical (N) radii of WGS84 at `lat`."""
+    phi = math.radians(lat)
+    w = math.sqrt(1.0 - WGS84_E2 * math.sin(phi) ** 2)
+    return WGS84_A * (1.0 - WGS84_E2) / w ** 3, WGS84_A / w
+
+
+def _small_fwd(lon: float, lat: float, sin_az, cos_az, dist_m):
+    """
+    Vectorized forward problem on the sphere osculating the ellipsoid at
+    (lon, lat). Each azimuth uses Euler's radius of curvature, which keeps
+    the result within a few metres of Geod.fwd for short distances.
+    """
+    m, n = _radii_of_curvature(lat)
+    delta = dist_m * (cos_az * cos_az / m + sin_az * sin_az / n)
+    phi = math.radians(lat)
+    sin_phi, cos_phi = math.sin(phi), math.cos(phi)
+    sin_d, cos_d = np.sin(delta), np.cos(delta)
+    sin_lat2 = sin_phi * cos_d + cos_phi * sin_d * cos_az
+    dlon = np.arctan2(sin_az * sin_d * cos_phi, cos_d - sin_phi * sin_lat2)
+    return lon + np.degrees(dlon), np.degrees(np.arcsin(sin_lat2))
+
+
+def _small_circle(lon: float, lat: float, radius_m: float,
+                  n: int = CIRCLE_PTS):
+    if n == CIRCLE_PTS:
+        sin_az, cos_az = _SIN_AZ, _COS_AZ
+    else:
+        az = np.linspace(0, 2 * np.pi, n, endpoint=False)
+        sin_az, cos_az = np.sin(az), np.cos(az)
+    return _small_fwd(lon, lat, sin_az, cos_az, radius_m)
+
+
+def _circle_coords(lon: float, lat: float, radius_m: float,
+                   n: int = CIRCLE_PTS) -> np.ndarray:
+    """Closed (n + 1, 2) ring of vertices at `radius_m` around (lon, lat)."""
+    if radius_m < SMALL_CIRCLE_MAX_M:
+        lons, lats = _small_circle(lon, lat, radius_m, n)
+    else:
+        az = np.linspace(0, 360, n, endpoint=False)
+        lons, lats, _ = _GEOD.fwd(
+            np.full(n, lon), np.full(n, lat), az, np.full(n, radius_m)
+        )
+    ring = np.empty((n + 1, 2))
+    ring[:n, 0] = lons
+    ring[:n, 1] = lats
+    ring[n] = ring[0]
+    return ring
+
+
 def geodesic_circle(lon: float, lat: float, radius_m: float,
                     n: int = CIRCLE_PTS) -> Polygon:
-    geod = Geod(ellps="WGS84")
-    az = np.linspace(0, 360, n, endpoint=False)
-    lons, lats, _ = geod.fwd(
-        np.full(n, lon), np.full(n, lat), az, np.full(n, radius_m)
-    )
-    coords = list(zip(lons.tolist(), lats.tolist()))
-    coords.append(coords[0])
-    return Polygon(coords)
+    return shapely.polygons(_circle_coords(lon, lat, radius_m, n))
 
 
 def geodesic_annulus(lon, lat, inner_m, outer_m, n=CIRCLE_PTS):
-    outer = geodesic_circle(lon, lat, outer_m, n)
-    inner = geodesic_circle(lon, lat, inner_m, n)
-    return outer.difference(inner)
+    # Concentric rings never cross, so the band is just a polygon with a
+    # hole; no GEOS difference needed.
+    outer = _circle_coords(lon, lat, outer_m, n)
+    if inner_m <= 0:
+        return shapely.polygons(outer)
+    inner = _circle_coords(lon, lat, inner_m, n)[::-1]
+    return shapely.polygons(outer, holes=[inner])
+
+
+@lru_cache(maxsize=1024)
+def _circle_cached(lon_q: float, lat_q: float, r_m: float) -> Polygon:
+    return geodesic_circle(lon_q, lat_q, r_m)
+
+
+@lru_cache(maxsize=1024)
+def _annulus_cached(lon_q: float, lat_q: float,
+                    inner_m: float, outer_m: float) -> Polygon:
+    return geodesic_annulus(lon_q, lat_q, inner_m, outer_m)
+
+
+def _circle(lon: float, lat: float, radius_m: float) -> Polygon:
+    """geodesic_circle memoized on coordinates rounded to 1e-6° (~0.1 m)."""
+    return _circle_cached(round(lon, 6), round(lat, 6), float(radius_m))
+
+
+def _annulus(lon: float, lat: float, inner_m: float, outer_m: float) -> Polygon:
+    """geodesic_annulus memoized like _circle."""
+    return _annulus_cached(round(lon, 6), round(lat, 6),
+                           float(inner_m), float(outer_m))
 
 
 def rect_from_center(lon, lat, half_w_m, half_h_m):
-    geod = Geod(ellps="WGS84")
-    n_lon, n_lat, _ = geod.fwd(lon, lat, 0, half_h_m)
-    s_lon, s_lat, _ = geod.fwd(lon, lat, 180, half_h_m)
-    e_lon, e_lat, _ = geod.fwd(lon, lat, 90, half_w_m)
-    w_lon, w_lat, _ = geod.fwd(lon, lat, 270, half_w_m)
+    if max(half_w_m, half_h_m) < SMALL_CIRCLE_MAX_M:
+        # N, S, E, W
+        lons, lats = _small_fwd(
+            lon, lat, np.array([0.0, 0.0, 1.0, -1.0]),
+            np.array([1.0, -1.0, 0.0, 0.0]),
+            np.array([half_h_m, half_h_m, half_w_m, half_w_m]),
+        )
+        return box(float(lons[3]), float(lats[1]),
+                   float(lons[2]), float(lats[0]))
+    n_lon, n_lat, _ = _GEOD.fwd(lon, lat, 0, half_h_m)
+    s_lon, s_lat, _ = _GEOD.fwd(lon, lat, 180, half_h_m)
+    e_lon, e_lat, _ = _GEOD.fwd(lon, lat, 90, half_w_m)
+    w_lon, w_lat, _ = _GEOD.fwd(lon, lat, 270, half_w_m)
     return box(float(w_lon), float(s_lat), float(e_lon), float(n_lat))
 
 
 # ── Zonal Stats ──────────────────────────────────────────────────────────────
 
-def compute_stats(tif_path: str, geom: Polygon,
-                  stats: list[str], band: int = 1) -> dict[str, float]:
+@contextmanager
+def _open_dataset(src):
+    """Yield an open dataset for a path; pass an already-open one through."""
+    if isinstance(src, (str, os.PathLike)):
+        with rasterio.open(src) as ds:
+            yield ds
+    else:
+        yield src
+
+
+def _to_native(geoms: list[Polygon], ds) -> list[Polygon]:
+    """
+    Reproject WGS84 geometries into the raster CRS. The coordinates of
+    every ring of every geometry go through the transformer in one
+    batched call.
+    """
+    if not ds.crs or ds.crs.is_geographic:
+        return geoms
+    to_crs = _transformer(WGS84, ds.crs.to_wkt())
+
+    def _tx(coords: np.ndarray) -> np.ndarray:
+        xs, ys = to_crs.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([xs, ys])
+
+    return list(shapely.transform(np.asarray(geoms, dtype=object), _tx))
+
+
+def _grid_window(transform, width: int, height: int, bounds) -> Window | None:
+    """Pixel window covering `bounds` on a grid, clipped to the grid."""
+    win = from_bounds(*bounds, transform=transform)
+    col0 = max(0, math.floor(win.col_off))
+    row0 = max(0, math.floor(win.row_off))
+    col1 = min(width, math.ceil(win.col_off + win.width))
+    row1 = min(height, math.ceil(win.row_off + win.height))
+    if col1 <= col0 or row1 <= row0:
+        return None
+    return Window(col0, row0, col1 - col0, row1 - row0)
+
+
+def _bounds_window(ds, bounds) -> Window | None:
+    """Pixel window covering `bounds` (native CRS), clipped to the raster."""
+    return _grid_window(ds.transform, ds.width, ds.height, bounds)
+
+
+def _moments_stats(n, s, ss, mn, mx, med, stats: list[str]) -> dict[str, float]:
+    """Build a stats dict from count, sum, sum of squares, min and max."""
+    if n == 0:
+        return {k: 0.0 if k in ("sum", "count") else float("nan")
+                for k in stats}
+    mean = s / n
+    out = {}
+    for k in stats:
+        if k == "sum":
+            out[k] = float(s)
+        elif k == "mean":
+            out[k] = float(mean)
+        elif k == "max":
+            out[k] = float(mx)
+        elif k == "min":
+            out[k] = float(mn)
+        elif k == "count":
+            out[k] = float(n)
+        elif k == "stdev":
+            out[k] = math.sqrt(max(ss / n - mean * mean, 0.0))
+        elif k == "median":
+            out[k] = float(med())
+        else:
+            out[k] = float("nan")
+    return out
+
+
+def _median(v: np.ndarray) -> float:
+    """Median via partial selection rather than a full sort."""
+    k = v.size // 2
+    if v.size % 2:
+        return float(np.partition(v, k)[k])
+    p = np.partition(v, (k - 1, k))
+    return float((p[k - 1] + p[k]) / 2)
+
+
+def _valid_mask(arr: np.ndarray, nd) -> np.ndarray | None:
     """
-    Compute zonal statistics using exactextract (preferred)
-    or rasterio.mask fallback.
+    Pixels that aren't nodata (or NaN, for float data), or None when every
+    pixel is valid.
     """
-    import geopandas as gpd
+    if arr.dtype.kind == "f":
+        valid = ~np.isnan(arr)
+        if nd is not None and not np.isnan(nd):
+            valid &= arr != nd
+        return valid
+    if nd is None:
+        return None
+    return arr != nd
 
-    gdf = gpd.GeoDataFrame(geometry=[geom], crs=WGS84)
 
-    if HAS_EXACT:
-        result = exact_extract(tif_path, gdf, stats, output="pandas")
-        row = result.iloc[0]
-        return {s: float(row[s]) for s in stats}
-    else:
-        from rasterio.mask import mask as rio_mask
-        with rasterio.open(tif_path) as ds:
-            if ds.crs and not ds.crs.is_geographic:
-                to_crs = Transformer.from_crs(WGS84, ds.crs, always_xy=True)
-                xs, ys = to_crs.transform(*geom.exterior.xy)
-                geom_native = Polygon(zip(xs, ys))
-            else:
-                geom_native = geom
+@dataclass
+class _Moments:
+    """Running count/sum/sum-of-squares/min/max over pixel values."""
+    n: int = 0
+    s: float = 0.0
+    ss: float = 0.0
+    mn: float = math.inf
+    mx: float = -math.inf
+    parts: list = field(default_factory=list)  # only kept for median
+
+    def add(self, arr: np.ndarray, mask: np.ndarray, keep: bool = False):
+        """Accumulate the pixels of `arr` where `mask` is set, in one pass."""
+        n, s, ss, mn, mx = reduce_masked(arr, mask)
+        if n == 0:
+            return
+        self.n += int(n)
+        self.s += float(s)
+        self.ss += float(ss)
+        self.mn = min(self.mn, float(mn))
+        self.mx = max(self.mx, float(mx))
+        if keep:
+            self.parts.append(arr[mask].astype(np.float64))
+
+    def stats(self, stats: list[str]) -> dict[str, float]:
+        return _moments_stats(
+            self.n, self.s, self.ss, self.mn, self.mx,
+            lambda: _median(np.concatenate(self.parts)), stats,
+        )
+
+
+def _iter_geom_windows(ds, windows: list[Window | None], band: int):
+    """
+    Walk the block-aligned tiles touched by any of `windows`, yielding
+    (read_window, [(index, sub_window), ...]) so each tile is read once
+    and shared by every geometry overlapping it. Small internal blocks
+    (e.g. single-row strips) are grouped up to about TILE_TARGET pixels.
+    """
+    bh, bw = ds.block_shapes[band - 1]
+    th = bh * max(1, TILE_TARGET // bh)
+    tw = bw * max(1, TILE_TARGET // bw)
+
+    tiles: dict[tuple[int, int], list[int]] = {}
+    for i, win in enumerate(windows):
+        if win is None:
+            continue
+        for ti in range(win.row_off // th, (win.row_off + win.height - 1) // th + 1):
+            for tj in range(win.col_off // tw, (win.col_off + win.width - 1) // tw + 1):
+                tiles.setdefault((ti, tj), []).append(i)
+
+    for (ti, tj), members in sorted(tiles.items()):
+        tile = Window(tj * tw, ti * th,
+                      min(tw, ds.width - tj * tw), min(th, ds.height - ti * th))
+        subs = [(i, windows[i].intersection(tile)) for i in members]
+        row0 = min(w.row_off for _, w in subs)
+        col0 = min(w.col_off for _, w in subs)
+        row1 = max(w.row_off + w.height for _, w in subs)
+        col1 = max(w.col_off + w.width for _, w in subs)
+        yield Window(col0, row0, col1 - col0, row1 - row0), subs
+
+
+def _fallback_stats(ds, geoms: list[Polygon], stats: list[str], band: int,
+                    all_touched: bool = True) -> list[dict[str, float]]:
+    """
+    rasterio fallback over geometries already in the raster CRS: walk the
+    block-aligned tiles under them, reading each tile once and
+    accumulating every geometry that overlaps it, so memory stays at one
+    tile rather than the whole envelope.
+    """
+    from rasterio.features import geometry_mask
+
+    windows = [_bounds_window(ds, g.bounds) for g in geoms]
+    acc = [_Moments() for _ in geoms]
+    keep = "median" in stats
+
+    for read_win, subs in _iter_geom_windows(ds, windows, band):
+        arr = ds.read(band, window=read_win)
+        valid = _valid_mask(arr, ds.nodata)
+        for i, sub in subs:
+            r0 = sub.row_off - read_win.row_off
+            c0 = sub.col_off - read_win.col_off
+            rows = slice(r0, r0 + sub.height)
+            cols = slice(c0, c0 + sub.width)
+            inside = geometry_mask(
+                [mapping(geoms[i])], out_shape=(sub.height, sub.width),
+                transform=ds.window_transform(sub),
+                all_touched=all_touched, invert=True,
+            )
+            if valid is not None:
+                inside &= valid[rows, cols]
+            acc[i].add(arr[rows, cols], inside, keep)
 
-            arr, _ = rio_mask(
-                ds, [mapping(geom_native)], crop=True,
-                filled=False, all_touched=True, indexes=band
+    return [a.stats(stats) for a in acc]
+
+
+def _overview_stats(info: RasterInfo, geoms: list[Polygon],
+                    stats: list[str]) -> list[dict[str, float]]:
+    """
+    Stats for geometries (raster CRS) from the in-memory overview, with a
+    pixel-centre test. Each overview pixel stands in for the native pixels
+    it averages, so sum and count are scaled by the pixel-area ratio.
+    Only valid for OVERVIEW_STATS.
+    """
+    from rasterio.features import geometry_mask
+
+    ov, t = info.overview, info.overview_transform
+    scale = abs(t.a * t.e) / (info.res_x * info.res_y)
+    out = []
+    for g in geoms:
+        acc = _Moments()
+        win = _grid_window(t, ov.shape[1], ov.shape[0], g.bounds)
+        if win is not None:
+            rows = slice(win.row_off, win.row_off + win.height)
+            cols = slice(win.col_off, win.col_off + win.width)
+            sub = ov[rows, cols]
+            inside = geometry_mask(
+                [mapping(g)], out_shape=sub.shape,
+                transform=t * Affine.translation(win.col_off, win.row_off),
+                invert=True,
             )
-            arr = arr[0]
-            nd = ds.nodata
-            if nd is not None:
-                arr = np.ma.masked_where(arr == nd, arr)
-
-            out = {}
-            for s in stats:
-                if s == "sum":
-                    out[s] = float(arr.sum())
-                elif s == "mean":
-                    out[s] = float(arr.mean())
-                elif s == "max":
-                    out[s] = float(arr.max())
-                elif s == "min":
-                    out[s] = float(arr.min())
-                elif s == "count":
-                    out[s] = float(arr.count())
-                elif s == "stdev":
-                    out[s] = float(arr.std())
-                elif s == "median":
-                    out[s] = float(np.ma.median(arr))
-                else:
-                    out[s] = float("nan")
-            return out
+            valid = _valid_mask(sub, info.nodata)
+            if valid is not None:
+                inside &= valid
+            acc.add(sub, inside)
+        vals = acc.stats(stats)
+        for k in ("sum", "count"):
+            if k in vals:
+                vals[k] *= scale
+        out.append(vals)
+    return out
+
+
+def _pixel_count(geom: Polygon, ds) -> float:
+    """Approximate number of native pixels covered by `geom` (raster CRS)."""
+    return geom.area / (ds.res[0] * ds.res[1])
+
+
+def _should_use_fast_path(geom: Polygon, ds) -> bool:
+    """
+    True when `geom` (raster CRS) covers so many pixels that fractional
+    edge coverage is noise next to the interior; a pixel-centre test is
+    then accurate enough and skips exactextract's per-edge-pixel work.
+    """
+    return _pixel_count(geom, ds) > EDGE_FRAC_THRESHOLD
+
+
+def _route(geom: Polygon, ds, band: int, info: RasterInfo | None,
+           stats: list[str]) -> str:
+    """Pick the stats backend for one geometry (raster CRS)."""
+    if (info is not None and info.overview is not None and band == 1
+            and OVERVIEW_STATS.issuperset(stats)
+            and _pixel_count(geom, ds) > OVERVIEW_MIN_PIXELS):
+        return "overview"
+    if not HAS_EXACT:
+        return "fallback"
+    return "fast" if _should_use_fast_path(geom, ds) else "exact"
+
+
+def compute_stats_batch(src, geoms: list[Polygon], stats: list[str],
+                        band: int = 1,
+                        info: RasterInfo | None = None) -> list[dict[str, float]]:
+    """
+    Compute zonal statistics for several geometries in one call, using
+    exactextract (preferred) or a rasterio fallback. Geometries large
+    enough for the pixel-centre fast path skip exactextract, and huge ones
+    are served from the overview on `info` when it has one and only
+    sum/mean/count are requested. `src` is a
+    path or an open dataset. Returns one stats dict per geometry, in order.
+    """
+    if not geoms:
+        return []
+
+    # Geometries entirely off the raster get empty stats without any I/O.
+    # For geographic rasters the WGS84 footprint is exact, so a batch that
+    # misses it doesn't even need the dataset.
+    if (info is not None and info.to_wgs is None and not shapely.intersects(
+            np.asarray(geoms, dtype=object),
+            shapely.polygons(info.bounds_polygon)).any()):
+        return [_moments_stats(0, 0.0, 0.0, None, None, None, stats)
+                for _ in geoms]
+
+    with _open_dataset(src) as ds:
+        native = _to_native(geoms, ds)
+        hits = shapely.intersects(np.asarray(native, dtype=object),
+                                  box(*ds.bounds))
+        groups: dict[str, list[int]] = {}
+        for i, g in enumerate(native):
+            route = _route(g, ds, band, info, stats) if hits[i] else "outside"
+            groups.setdefault(route, []).append(i)
+
+        out: list[dict[str, float]] = [{}] * len(native)
+        for route, idx in groups.items():
+            part = [native[i] for i in idx]
+            if route == "outside":
+                vals = [_moments_stats(0, 0.0, 0.0, None, None, None, stats)
+                        for _ in part]
+            elif route == "overview":
+                vals = _overview_stats(info, part, stats)
+            elif route == "exact":
+                import geopandas as gpd
+
+                gdf = gpd.GeoDataFrame(geometry=part,
+                                       crs=ds.crs.to_wkt() if ds.crs else None)
+                result = exact_extract(ds, gdf, stats, output="pandas")
+                rows = result[stats].to_numpy(dtype=np.float64)
+                vals = [dict(zip(stats, row.tolist())) for row in rows]
+            else:
+                vals = _fallback_stats(ds, part, stats, band,
+                                       all_touched=route == "fallback")
+            for i, v in zip(idx, vals):
+                out[i] = v
+        return out
+
+
+def compute_stats(src, geom: Polygon, stats: list[str], band: int = 1,
+                  info: RasterInfo | None = None) -> dict[str, float]:
+    """Zonal statistics for a single geometry."""
+    return compute_stats_batch(src, [geom], stats, band, info)[0]
+
+
+def compute_stats_parallel(src, geoms: list[Polygon], stats: list[str],
+                           band: int = 1,
+                           info: RasterInfo | None = None) -> list[dict[str, float]]:
+    """
+    compute_stats_batch split into chunks across the shared thread pool.
+    Dataset handles can't be shared between threads, so each chunk opens
+    its own handle on the raster file. Results keep the input order.
+    """
+    n_chunks = min(MAX_WORKERS, len(geoms) // 2)
+    if len(geoms) < PARALLEL_MIN_GEOMS or n_chunks < 2:
+        return compute_stats_batch(src, geoms, stats, band, info)
+
+    path = src if isinstance(src, (str, os.PathLike)) else src.name
+    size = math.ceil(len(geoms) / n_chunks)
+    chunks = [geoms[i:i + size] for i in range(0, len(geoms), size)]
+    parts = _POOL.map(
+        lambda chunk: compute_stats_batch(path, chunk, stats, band, info),
+        chunks,
+    )
+    return [vals for part in parts for vals in part]
 
 
 # ── Query Runners ────────────────────────────────────────────────────────────
 
-def run_circle_query(tif_path: str, lon: float, lat: float,
+def run_circle_query(src, lon: float, lat: float,
                      radii_km: list[float], stats: list[str],
-                     band: int = 1) -> list[QueryResult]:
-    results = []
-    for r in sorted(radii_km):
-        circ = geodesic_circle(lon, lat, r * 1000)
-        vals = compute_stats(tif_path, circ, stats, band)
-        results.append(QueryResult(
+                     band: int = 1,
+                     info: RasterInfo | None = None) -> list[QueryResult]:
+    radii = sorted(radii_km)
+    circles = [_circle(lon, lat, r * 1000) for r in radii]
+    all_vals = compute_stats_batch(src, circles, stats, band, info)
+    return [
+        QueryResult(
             label=f"{r} km",
             geometry_geojson=mapping(circ),
             stats=vals,
-        ))
-    return results
+        )
+        for r, circ, vals in zip(radii, circles, all_vals)
+    ]
 
 
-def run_band_query(tif_path: str, lon: float, lat: float,
+def run_band_query(src, lon: float, lat: float,
                    edges_km: list[float], stats: list[str],
-                   band: int = 1) -> list[QueryResult]:
+                   band: int = 1,
+                   info: RasterInfo | None = None) -> list[QueryResult]:
     edges = sorted(set(edges_km))
-    results = []
-    for i in range(len(edges) - 1):
-        inner, outer = edges[i], edges[i + 1]
-        ring = geodesic_annulus(lon, lat, inner * 1000, outer * 1000)
-        vals = compute_stats(tif_path, ring, stats, band)
-        results.append(QueryResult(
+    pairs = list(zip(edges[:-1], edges[1:]))
+    rings = [_annulus(lon, lat, inner * 1000, outer * 1000)
+             for inner, outer in pairs]
+    all_vals = compute_stats_parallel(src, rings, stats, band, info)
+    return [
+        QueryResult(
             label=f"{inner}–{outer} km",
             geometry_geojson=mapping(ring),
             stats=vals,
-        ))
-    return results
+        )
+        for (inner, outer), ring, vals in zip(pairs, rings, all_vals)
+    ]
 
 
-def run_rect_query(tif_path: str, lon: float, lat: float,
+def run_rect_query(src, lon: float, lat: float,
                    half_w_km: float, half_h_km: float,
-                   stats: list[str], band: int = 1) -> list[QueryResult]:
+                   stats: list[str], band: int = 1,
+                   info: RasterInfo | None = None) -> list[QueryResult]:
     rect = rect_from_center(lon, lat, half_w_km * 1000, half_h_km * 1000)
-    vals = compute_stats(tif_path, rect, stats, band)
+    vals = compute_stats(src, rect, stats, band, info)
     return [QueryResult(
         label=f"{half_w_km*2}×{half_h_km*2} km",
         geometry_geojson=mapping(rect),
@@ -262,18 +764,20 @@ def run_rect_query(tif_path: str, lon: float, lat: float,
     )]
 
 
-def run_compare_query(tif_path: str,
+def run_compare_query(src,
                       points: list[dict],  # [{name, lat, lon}, ...]
                       radius_km: float,
                       stats: list[str],
-                      band: int = 1) -> list[QueryResult]:
-    results = []
-    for pt in points:
-        circ = geodesic_circle(pt["lon"], pt["lat"], radius_km * 1000)
-        vals = compute_stats(tif_path, circ, stats, band)
-        results.append(QueryResult(
+                      band: int = 1,
+                      info: RasterInfo | None = None) -> list[QueryResult]:
+    circles = [_circle(pt["lon"], pt["lat"], radius_km * 1000)
+               for pt in points]
+    all_vals = compute_stats_parallel(src, circles, stats, band, info)
+    return [
+        QueryResult(
             label=pt["name"],
             geometry_geojson=mapping(circ),
             stats={**vals, "_lat": pt["lat"], "_lon": pt["lon"]},
-        ))
-    return results
\ No newline at end of file
+        )
+        for pt, circ, vals in zip(points, circles, all_vals)
+    ]
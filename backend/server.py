@@ -10,11 +10,12 @@ import signal
 import atexit
 from pathlib import Path
 
+import orjson
 from flask import Flask, request, jsonify, send_from_directory, abort
 from flask_cors import CORS
 
 from .geotiff_engine import (
-    RasterStore, HAS_EXACT,
+    RasterStore, EmptyUploadError, HAS_EXACT,
     run_circle_query, run_band_query,
     run_rect_query, run_compare_query,
 )
@@ -76,12 +77,10 @@ def upload_raster():
     if not f.filename:
         return jsonify({"error": "Empty filename"}), 400
 
-    data = f.read()
-    if len(data) == 0:
-        return jsonify({"error": "Empty file"}), 400
-
     try:
-        raster_id, info = store.load(f.filename, data)
+        raster_id, info = store.load(f)
+    except EmptyUploadError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": f"Failed to load raster: {e}"}), 400
 
@@ -105,6 +104,28 @@ def unload_raster(raster_id):
     return jsonify({"ok": True})
 
 
+def _json() -> dict:
+    """Parse the request body with orjson, skipping Flask's JSON layer."""
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        abort(400, description="Invalid JSON body")
+
+
+def _json_response(payload: dict):
+    """Serialize a response body with orjson (NaN becomes null)."""
+    return app.response_class(orjson.dumps(payload), mimetype="application/json")
+
+
+def _results_response(results: list):
+    return _json_response({
+        "results": [
+            {"label": r.label, "geometry": r.geometry_geojson, "stats": r.stats}
+            for r in results
+        ]
+    })
+
+
 def _parse_query_params(data: dict) -> tuple:
     """Extract and validate common query parameters."""
     raster_id = data.get("raster_id")
@@ -121,14 +142,14 @@ def _parse_query_params(data: dict) -> tuple:
         stats = ["sum"]
 
     band = int(data.get("band", 1))
-    return info, stats, band
+    return raster_id, info, stats, band
 
 
 @app.route("/api/query/circle", methods=["POST"])
 def query_circle():
-    data = request.get_json(force=True)
+    data = _json()
     try:
-        info, stats, band = _parse_query_params(data)
+        raster_id, info, stats, band = _parse_query_params(data)
         lon = float(data["lon"])
         lat = float(data["lat"])
         radii = [float(r) for r in data["radii_km"]]
@@ -138,23 +159,19 @@ def query_circle():
         return jsonify({"error": str(e)}), 400
 
     try:
-        results = run_circle_query(info.path, lon, lat, radii, stats, band)
+        with store.dataset(raster_id) as ds:
+            results = run_circle_query(ds, lon, lat, radii, stats, band, info)
     except Exception as e:
         return jsonify({"error": f"Query failed: {e}"}), 500
 
-    return jsonify({
-        "results": [
-            {"label": r.label, "geometry": r.geometry_geojson, "stats": r.stats}
-            for r in results
-        ]
-    })
+    return _results_response(results)
 
 
 @app.route("/api/query/band", methods=["POST"])
 def query_band():
-    data = request.get_json(force=True)
+    data = _json()
     try:
-        info, stats, band = _parse_query_params(data)
+        raster_id, info, stats, band = _parse_query_params(data)
         lon = float(data["lon"])
         lat = float(data["lat"])
         edges = [float(e) for e in data["edges_km"]]
@@ -164,23 +181,19 @@ def query_band():
         return jsonify({"error": str(e)}), 400
 
     try:
-        results = run_band_query(info.path, lon, lat, edges, stats, band)
+        with store.dataset(raster_id) as ds:
+            results = run_band_query(ds, lon, lat, edges, stats, band, info)
     except Exception as e:
         return jsonify({"error": f"Query failed: {e}"}), 500
 
-    return jsonify({
-        "results": [
-            {"label": r.label, "geometry": r.geometry_geojson, "stats": r.stats}
-            for r in results
-        ]
-    })
+    return _results_response(results)
 
 
 @app.route("/api/query/rect", methods=["POST"])
 def query_rect():
-    data = request.get_json(force=True)
+    data = _json()
     try:
-        info, stats, band = _parse_query_params(data)
+        raster_id, info, stats, band = _parse_query_params(data)
         lon = float(data["lon"])
         lat = float(data["lat"])
         half_w = float(data["half_w_km"])
@@ -189,23 +202,20 @@ def query_rect():
         return jsonify({"error": str(e)}), 400
 
     try:
-        results = run_rect_query(info.path, lon, lat, half_w, half_h, stats, band)
+        with store.dataset(raster_id) as ds:
+            results = run_rect_query(ds, lon, lat, half_w, half_h, stats,
+                                     band, info)
     except Exception as e:
         return jsonify({"error": f"Query failed: {e}"}), 500
 
-    return jsonify({
-        "results": [
-            {"label": r.label, "geometry": r.geometry_geojson, "stats": r.stats}
-            for r in results
-        ]
-    })
+    return _results_response(results)
 
 
 @app.route("/api/query/compare", methods=["POST"])
 def query_compare():
-    data = request.get_json(force=True)
+    data = _json()
     try:
-        info, stats, band = _parse_query_params(data)
+        raster_id, info, stats, band = _parse_query_params(data)
         radius = float(data["radius_km"])
         points = data["points"]  # [{name, lat, lon}, ...]
         for pt in points:
@@ -215,22 +225,18 @@ def query_compare():
         return jsonify({"error": str(e)}), 400
 
     try:
-        results = run_compare_query(info.path, points, radius, stats, band)
+        with store.dataset(raster_id) as ds:
+            results = run_compare_query(ds, points, radius, stats, band, info)
     except Exception as e:
         return jsonify({"error": f"Query failed: {e}"}), 500
 
-    return jsonify({
-        "results": [
-            {"label": r.label, "geometry": r.geometry_geojson, "stats": r.stats}
-            for r in results
-        ]
-    })
+    return _results_response(results)
 
 
 @app.route("/api/export/csv", methods=["POST"])
 def export_csv():
     """Convert results JSON to CSV string."""
-    data = request.get_json(force=True)
+    data = _json()
     results = data.get("results", [])
     if not results:
         return jsonify({"error": "No results"}), 400
@@ -239,19 +245,17 @@ def export_csv():
     import io
 
     output = io.StringIO()
+    stats_rows = [r.get("stats", {}) for r in results]
     # Collect all stat keys
-    all_keys = set()
-    for r in results:
-        all_keys.update(r.get("stats", {}).keys())
-    all_keys = sorted(k for k in all_keys if not k.startswith("_"))
+    all_keys = sorted({k for st in stats_rows for k in st if not k.startswith("_")})
+    rows = [
+        [r["label"], *[st.get(k, "") for k in all_keys]]
+        for r, st in zip(results, stats_rows)
+    ]
 
     writer = csv.writer(output)
     writer.writerow(["label"] + all_keys)
-    for r in results:
-        row = [r["label"]]
-        for k in all_keys:
-            row.append(r.get("stats", {}).get(k, ""))
-        writer.writerow(row)
+    writer.writerows(rows)
 
     return jsonify({"csv": output.getvalue()})
 
@@ -259,6 +263,16 @@ def export_csv():
 # ── Main ─────────────────────────────────────────────────────────────────────
 
 def main():
+    # GDAL reads these process-wide on first use, so set them before the
+    # first raster is opened; every request thread then shares one warm
+    # block cache. A fixed 1 GB keeps a large raster's tiles resident
+    # across queries rather than depending on GDAL's 5%-of-RAM default.
+    os.environ.setdefault("GDAL_CACHEMAX", "1024")
+    os.environ.setdefault("VSI_CACHE", "TRUE")
+    os.environ.setdefault("VSI_CACHE_SIZE", "268435456")
+    os.environ.setdefault("GDAL_DISABLE_READDIR_ON_OPEN", "EMPTY_DIR")
+    os.environ.setdefault("CPL_VSIL_CURL_ALLOWED_EXTENSIONS", ".tif,.tiff")
+
     port = int(os.environ.get("GEO_PORT", 8964))
     print(f"Starting Geo Analyzer backend on http://127.0.0.1:{port}", flush=True)
     print(f"Frontend: {FRONTEND_DIR}", flush=True)
@@ -115,7 +115,7 @@ const App = (() => {
         if (!statName) return;
 
         const labels = lastResults.map(r => r.label);
-        const values = lastResults.map(r => r.stats[statName] || 0);
+        const values = lastResults.map(r => r.stats[statName] ?? null);
 
         const yLabels = {
             circle: "Radius",
@@ -171,7 +171,7 @@ const App = (() => {
             tr.innerHTML = `<td>${r.label}</td>` +
                 statKeys.map(s => {
                     const v = r.stats[s];
-                    return `<td>${v !== undefined ? Utils.fmtTable(v) : "—"}</td>`;
+                    return `<td>${v != null ? Utils.fmtTable(v) : "—"}</td>`;
                 }).join("");
             tbody.appendChild(tr);
         });
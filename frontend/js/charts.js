@@ -21,10 +21,16 @@ const ChartManager = (() => {
         return suffix ? `${statName} (${suffix})` : statName;
     }
 
+    // Stats of empty geometries arrive as null; leave them out of totals
+    function present(values) {
+        return values.filter(v => v != null);
+    }
+
     function makeSubtitle(values, statName, suffix, divisor) {
-        const total = values.reduce((a, b) => a + b, 0);
-        const min = Math.min(...values);
-        const max = Math.max(...values);
+        const shown = present(values);
+        const total = shown.reduce((a, b) => a + b, 0);
+        const min = shown.length ? Math.min(...shown) : null;
+        const max = shown.length ? Math.max(...shown) : null;
         return `Total: ${Utils.fmtTable(total)} · ` +
                `Range: ${Utils.fmtTable(min)} – ${Utils.fmtTable(max)} · ` +
                `${values.length} items`;
@@ -38,9 +44,9 @@ const ChartManager = (() => {
 
         destroyChart();
 
-        const maxVal = Math.max(...values.map(Math.abs), 0);
+        const maxVal = Math.max(...present(values).map(Math.abs), 0);
         const { suffix, divisor } = Utils.pickUnit(maxVal);
-        const scaled = values.map(v => v / divisor);
+        const scaled = values.map(v => v == null ? null : v / divisor);
         const axisLabel = makeAxisLabel(statName, suffix);
 
         const bgColors = values.map((_, i) => COLORS.fills[i % COLORS.fills.length]);
@@ -122,12 +128,12 @@ const ChartManager = (() => {
                             },
                             afterLabel: (ctx) => {
                                 const parts = [];
-                                if (suffix) {
+                                if (suffix && scaled[ctx.dataIndex] != null) {
                                     parts.push(` Scaled: ${scaled[ctx.dataIndex].toFixed(2)} ${suffix}`);
                                 }
                                 if (values.length > 1) {
-                                    const total = values.reduce((a, b) => a + b, 0);
-                                    if (total > 0) {
+                                    const total = present(values).reduce((a, b) => a + b, 0);
+                                    if (total > 0 && values[ctx.dataIndex] != null) {
                                         const pct = ((values[ctx.dataIndex] / total) * 100).toFixed(1);
                                         parts.push(` Share: ${pct}%`);
                                     }
@@ -180,7 +186,7 @@ const ChartManager = (() => {
                     const meta = chart.getDatasetMeta(0);
                     meta.data.forEach((bar, i) => {
                         const val = scaled[i];
-                        const text = suffix
+                        const text = suffix && val != null
                             ? `${val.toFixed(2)} ${suffix}`
                             : Utils.fmtTable(values[i]);
 
@@ -205,7 +211,7 @@ const ChartManager = (() => {
 
         destroyChart();
 
-        const total = values.reduce((a, b) => a + b, 0);
+        const total = present(values).reduce((a, b) => a + b, 0);
         const bgColors = values.map((_, i) => COLORS.fills[i % COLORS.fills.length]);
 
         const subtitleEl = document.getElementById("chart-modal-subtitle");
@@ -256,7 +262,7 @@ const ChartManager = (() => {
                             generateLabels: (chart) => {
                                 return chart.data.labels.map((label, i) => {
                                     const val = chart.data.datasets[0].data[i];
-                                    const pct = total > 0
+                                    const pct = total > 0 && val != null
                                         ? ((val / total) * 100).toFixed(1) : "0.0";
                                     return {
                                         text: `${label}: ${Utils.fmtTable(val)} (${pct}%)`,
@@ -280,7 +286,7 @@ const ChartManager = (() => {
                         callbacks: {
                             label: (ctx) => {
                                 const val = ctx.raw;
-                                const pct = total > 0
+                                const pct = total > 0 && val != null
                                     ? ((val / total) * 100).toFixed(1) : "0.0";
                                 return ` ${statName}: ${Utils.fmtTable(val)} (${pct}%)`;
                             },
@@ -81,8 +81,10 @@ const Utils = (() => {
 
     /**
      * Format a number for table display (full integer with commas).
+     * Missing values (null from empty geometries) show as a dash.
      */
     function fmtTable(value) {
+        if (value == null) return "—";
         return Math.round(value).toLocaleString("en-US");
     }
 
@@ -13,6 +13,11 @@ binaries = sum([collect_dynamic_libs(p) for p in geo_packages], [])
 datas = sum([collect_data_files(p) for p in geo_packages], [])
 hiddenimports = sum([collect_submodules(p) for p in geo_packages], [])
 
+# numba: only the CPU JIT behind njit, not its test suite, CUDA target or AOT compiler
+numba_skip = ('numba.tests', 'numba.testing', 'numba.cuda', 'numba.pycc')
+binaries += collect_dynamic_libs('llvmlite')
+hiddenimports += collect_submodules('numba', filter=lambda name: not name.startswith(numba_skip))
+
 # Bundle frontend files
 datas += [(str(ROOT / 'frontend'), 'frontend')]
 